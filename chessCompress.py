@@ -1,5 +1,8 @@
 import chess
+import glob
 import math
+import multiprocessing
+import os
 import threading
 from Queue import PriorityQueue, Empty
 import time
@@ -197,20 +200,26 @@ def unpackFromFile(f):
     
 
 def compressFile(inputFile, outputFile, sort = None, checks = None, verbose = False):
+    numGames = 0
     with open(inputFile) as f, open(outputFile, 'wb') as g:
         for n, line in enumerate(f):
             if verbose:
                 print 'Encoding game: %d' % (n+1)
             encoding = encodeGame(line.split())
             packToFile(g, encoding)
+            numGames = n+1
+    return numGames
 
 def decompressFile(inputFile, outputFile, sort = None, checks = None, verbose = False):
+    numGames = 0
     with open(inputFile, 'rb') as f, open(outputFile, 'wb') as g:
         for n, encoding in enumerate(unpackFromFile(f)):
             if verbose:
                 print 'Reading game: %d' % (n+1)
             game = decodeGame(encoding, sort = sort, checks = checks)
             g.write(' '.join(game) + '\n')
+            numGames = n+1
+    return numGames
            
 def readEncodeWorker(rawQueue, inputFile, data, verbose = False):
     with open(inputFile) as f:
@@ -402,6 +411,108 @@ def decompressFileFast(inputFile, outputFile, sort = None, checks = None, verbos
     if verbose:
         print 'Done'
 
+def findBatchFiles(source):
+    '''
+    @param source - Where to find the files to process.  One of:
+    A directory: Every file directly inside it.
+    A glob pattern: Every file matching it, e.g. 'games/*.txt'.
+    A manifest: A file listing one path per line.  Relative paths are relative to the manifest.
+    '''
+    if os.path.isdir(source):
+        files = [os.path.join(source, name) for name in os.listdir(source)]
+        files = [path for path in files if os.path.isfile(path)]
+    elif glob.has_magic(source):
+        files = [path for path in glob.glob(source) if os.path.isfile(path)]
+    else:
+        base = os.path.dirname(source)
+        with open(source) as f:
+            files = [os.path.join(base, line.strip()) for line in f if line.strip() != '']
+        for path in files:
+            if not os.path.isfile(path):
+                raise ValueError('%s is listed in %s but is not a file' % (path, source))
+
+    if len(files) == 0:
+        raise ValueError('No files found in %s' % source)
+
+    names = {}
+    for path in files:
+        name = os.path.basename(path)
+        if name in names:
+            raise ValueError('%s and %s would both be written to %s' % (names[name], path, name))
+        names[name] = path
+
+    return files
+
+def formatThroughput(name, numGames, numBytes, elapsed):
+    elapsed = max(elapsed, 1e-6)
+    return '%s: %d games, %d bytes in %.3fs (%.1f games/s, %.1f KB/s)' % (name, numGames, numBytes, elapsed, numGames/elapsed, numBytes/elapsed/1024)
+
+def batchWorker(job):
+    inputFile, outputFile, compress, sort, checks, verbose = job
+    numBytes = os.path.getsize(inputFile)
+    start = time.time()
+    try:
+        if compress:
+            numGames = compressFile(inputFile, outputFile, sort = sort, checks = checks, verbose = verbose)
+        else:
+            numGames = decompressFile(inputFile, outputFile, sort = sort, checks = checks, verbose = verbose)
+    except Exception as e:
+        if os.path.exists(outputFile):
+            os.remove(outputFile)
+        return (inputFile, 0, numBytes, time.time() - start, '%s: %s' % (type(e).__name__, e))
+    return (inputFile, numGames, numBytes, time.time() - start, None)
+
+def batchFiles(source, outputDir, compress = True, sort = None, checks = None, verbose = False, threads = None):
+    '''
+    Compresses (or decompresses) every file found by findBatchFiles(source) into outputDir, keeping each file's name.
+    All files share one pool of worker processes.  The largest files are handed out first so no process is left
+    running a big file alone at the end.
+
+    Returns a list of (inputFile, numGames, numBytes, seconds, error), one per file.  error is None on success.
+    '''
+    if threads is None:
+        threads = 1
+    if threads < 1:
+        raise ValueError('Need at least 1 worker, got %d' % threads)
+
+    if not os.path.isdir(outputDir):
+        os.makedirs(outputDir)
+
+    jobs = []
+    for path in findBatchFiles(source):
+        outputFile = os.path.join(outputDir, os.path.basename(path))
+        if os.path.realpath(path) == os.path.realpath(outputFile):
+            raise ValueError('%s would be overwritten by its own output' % path)
+        jobs.append((path, outputFile, compress, sort, checks, verbose))
+    jobs.sort(key=lambda job: os.path.getsize(job[0]), reverse=True)
+
+    if verbose:
+        print 'Found %d files in %s' % (len(jobs), source)
+
+    start = time.time()
+    stats = []
+    pool = multiprocessing.Pool(min(threads, len(jobs)))
+    try:
+        for stat in pool.imap_unordered(batchWorker, jobs):
+            inputFile, numGames, numBytes, elapsed, error = stat
+            if error is None:
+                print formatThroughput(inputFile, numGames, numBytes, elapsed)
+            else:
+                print '%s: FAILED (%s)' % (inputFile, error)
+            stats.append(stat)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+    elapsed = time.time() - start
+
+    done = [s for s in stats if s[4] is None]
+    totalGames = sum(s[1] for s in done)
+    totalBytes = sum(s[2] for s in done)
+    print formatThroughput('Total (%d files, %d failed)' % (len(done), len(stats) - len(done)), totalGames, totalBytes, elapsed)
+
+    return stats
+
 
 if __name__ == '__main__':
     def testing(t = -1):
@@ -532,7 +643,21 @@ if __name__ == '__main__':
     elif '-tt' in arguments:
         longerTesting(arguments['-tt'])
     elif '-ttt' in arguments:
-        piTesting(arguments['-ttt'])    
+        piTesting(arguments['-ttt'])
+    elif '-b' in arguments and '-o' in arguments and ('-c' in arguments or '-d' in arguments):
+        threads = None
+        if '-mt' in arguments:
+            try:
+                threads = int(arguments['-mt'])
+            except ValueError:
+                threads = 8
+        try:
+            stats = batchFiles(arguments['-b'], arguments['-o'], compress='-c' in arguments, verbose='-v' in arguments, threads=threads)
+        except (ValueError, IOError, OSError) as e:
+            print e
+            sys.exit(2)
+        if any(s[4] is not None for s in stats):
+            sys.exit(1)
     elif len(sys.argv) > 5:
         comFile, decomFile = arguments['-cf'], arguments['-df']
         if '-c' in arguments: